@@ -1,6 +1,59 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import BufferingHandler
+
 from django.apps import AppConfig
 
 
+def _handler_by_name(name):
+    # logging.getHandlerByName() only exists on Python 3.12+
+    if hasattr(logging, 'getHandlerByName'):
+        return logging.getHandlerByName(name)
+    return logging._handlers.get(name)
+
+
+def _restart_listener(handler, listener):
+    # A forked child inherits the listener but not its thread; give it a
+    # fresh queue and buffers (records copied from the parent are the
+    # parent's to write) and a thread of its own
+    handler.queue = listener.queue = queue.Queue(-1)
+    for target in listener.handlers:
+        if isinstance(target, BufferingHandler):
+            target.buffer = []
+    listener._thread = None
+    listener.start()
+
+
 class AssessmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.assessments'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        self._start_log_listener()
+    
+    def _start_log_listener(self):
+        """
+        Start draining the 'queue' handler into the buffered file handler on
+        a background thread, so request threads never block on disk writes.
+        At interpreter exit the listener is stopped, then buffers flushed.
+        
+        Forked workers (Celery prefork, gunicorn --preload) start their own
+        listener thread, as threads do not survive fork().
+        """
+        handler = _handler_by_name('queue')
+        listener = getattr(handler, 'listener', None)
+        if listener is None or listener._thread is not None:
+            return
+        
+        listener.start()
+        # atexit runs hooks in reverse order of registration
+        for target in listener.handlers:
+            atexit.register(target.flush)
+        atexit.register(listener.stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(
+                after_in_child=lambda: _restart_listener(handler, listener)
+            )
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+def token_cache_key(key):
+    return f'auth-token:{key}'
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that keeps resolved tokens (with their user) in the
+    Django cache, so authenticated requests skip the token/user SELECT.
+    
+    Signals drop an entry when its token or user changes (logout, password
+    change, deactivation); AUTH_TOKEN_CACHE_TIMEOUT bounds it otherwise.
+    A timeout of 0 (the default without a shared cache, where signals
+    can't reach other workers) looks every token up in the database.
+    """
+    
+    def authenticate_credentials(self, key):
+        timeout = settings.AUTH_TOKEN_CACHE_TIMEOUT
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key) if timeout else None
+        
+        if token is None:
+            token = self._fetch_token(key)
+            if timeout:
+                cache.set(cache_key, token, timeout)
+        
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        
+        return token.user, token
+    
+    def _fetch_token(self, key):
+        """
+        The parent's lookup, narrowed to the user columns requests rely
+        on; the password hash and profile fields are neither fetched nor
+        cached (deferred fields still load on access).
+        """
+        model = self.get_model()
+        try:
+            return model.objects.select_related('user').only(
+                'key', 'user', 'user__id', 'user__username', 'user__is_active'
+            ).get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
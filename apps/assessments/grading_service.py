@@ -9,19 +9,74 @@ Architecture:
 
 This design allows easy strategy switching via config.
 """
+import hashlib
 import json
+import logging
 import re
 from abc import ABC, abstractmethod
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
+from functools import lru_cache
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 
+try:
+    # C++ Levenshtein implementation, far faster than difflib on short strings
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
+
+try:
+    # C extension for multi-pattern matching, used for essay keywords
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # Faster LLM response decoding; its errors subclass ValueError like json's
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+logger = logging.getLogger(__name__)
+
+
+# Compiled once at import; used on every graded answer
+_WS_RE = re.compile(r'\s+')
+# Words of 4+ characters; the length filter runs inside the regex engine
+_KEYWORD_RE = re.compile(r'\w{4,}')
+_STOPWORDS = frozenset({
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'in', 'on',
+    'at', 'to', 'for', 'of', 'and', 'or', 'but',
+})
+# Markdown code fences some LLM replies wrap their JSON in
+_FENCE_RE = re.compile(r'```(?:json)?\s*|\s*```')
+
+# Static part of every grading prompt. Sent once as the model's system
+# instruction instead of being repeated in each request.
+_GRADER_SYSTEM_INSTRUCTION = """You are an expert academic grader. Evaluate student answers fairly and objectively.
+
+Grading Guidelines:
+- For multiple choice/true-false: Full points only for exact matches
+- For short answers: Full points if key concept is present, partial for close answers
+- For essays: Evaluate depth, accuracy, and coverage of key concepts
+- Be fair but rigorous. Award partial credit where appropriate.
+"""
+
 
 class BaseGrader(ABC):
     """
     Strategy interface for grading implementations.
     Enables dependency injection and easy testing.
     """
+    # Graders that wait on the network set this above 1 so grade_answers
+    # overlaps requests; CPU-bound graders stay sequential.
+    max_workers = 1
+    
     @abstractmethod
     def grade_answer(self, question, student_answer):
         """
@@ -32,6 +87,21 @@ class BaseGrader(ABC):
         }
         """
         pass
+    
+    def grade_answers(self, items):
+        """
+        Grade a sequence of (question, student_answer) pairs.
+        Returns result dicts in the same order. Strategies that can grade
+        in bulk (e.g. one LLM request per submission) override this.
+        """
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [
+                self.grade_answer(question, student_answer)
+                for question, student_answer in items
+            ]
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda item: self.grade_answer(*item), items))
 
 
 class MockGrader(BaseGrader):
@@ -48,13 +118,15 @@ class MockGrader(BaseGrader):
     
     def grade_answer(self, question, student_answer):
         qtype = question.question_type
+        # Lowercased once here and shared by every helper below
+        student_lc = student_answer.strip().lower()
         
         if qtype in ['multiple_choice', 'true_false']:
-            return self._grade_exact_match(question, student_answer)
+            return self._grade_exact_match(question, student_answer, student_lc)
         elif qtype == 'short_answer':
-            return self._grade_short_answer(question, student_answer)
+            return self._grade_short_answer(question, student_answer, student_lc)
         elif qtype == 'essay':
-            return self._grade_essay(question, student_answer)
+            return self._grade_essay(question, student_answer, student_lc)
         else:
             # Default fallback
             return {
@@ -63,12 +135,15 @@ class MockGrader(BaseGrader):
                 'feedback': 'Unsupported question type'
             }
     
-    def _grade_exact_match(self, question, student_answer):
+    def _grade_exact_match(self, question, student_answer, student_lc):
         """For multiple choice and true/false - strict matching."""
-        normalized_expected = self._normalize_text(question.expected_answer)
-        normalized_student = self._normalize_text(student_answer)
-        
-        is_correct = normalized_expected == normalized_student
+        if student_answer == question.expected_answer:
+            # Identical input (the common auto-submitted case), skip normalization
+            is_correct = True
+        else:
+            normalized_expected = self._artifacts(question).normalized_expected
+            normalized_student = _WS_RE.sub(' ', student_lc)
+            is_correct = normalized_expected == normalized_student
         
         return {
             'is_correct': is_correct,
@@ -76,20 +151,23 @@ class MockGrader(BaseGrader):
             'feedback': 'Correct!' if is_correct else f'Expected: {question.expected_answer}'
         }
     
-    def _grade_short_answer(self, question, student_answer):
+    def _grade_short_answer(self, question, student_answer, student_lc):
         """
         Uses string similarity for partial credit.
         Handles typos and minor variations.
         """
-        normalized_expected = self._normalize_text(question.expected_answer)
-        normalized_student = self._normalize_text(student_answer)
-        
-        # Calculate similarity ratio using SequenceMatcher
-        similarity = SequenceMatcher(
-            None, 
-            normalized_expected, 
-            normalized_student
-        ).ratio()
+        if student_answer == question.expected_answer:
+            # Identical input, skip normalization and the similarity scan
+            similarity = 1.0
+        else:
+            normalized_expected = self._artifacts(question).normalized_expected
+            normalized_student = _WS_RE.sub(' ', student_lc)
+            # Below 0.5 earns nothing, so the exact ratio is not needed there
+            similarity = self._similarity(
+                normalized_expected,
+                normalized_student,
+                cutoff=0.5
+            )
         
         # Grading thresholds
         if similarity >= 0.9:
@@ -115,26 +193,27 @@ class MockGrader(BaseGrader):
             'feedback': feedback
         }
     
-    def _grade_essay(self, question, student_answer):
+    def _grade_essay(self, question, student_answer, student_lc):
         """
         Keyword density scoring for essay questions.
         Extracts key concepts from expected answer and checks coverage.
         """
-        # Extract keywords from expected answer (simple approach)
-        expected_keywords = self._extract_keywords(question.expected_answer)
-        student_text_lower = student_answer.lower()
+        # Keywords are extracted from the expected answer once per question
+        artifacts = self._artifacts(question)
+        expected_keywords = artifacts.keywords
         
         # Count matched keywords
-        matched_count = sum(
-            1 for keyword in expected_keywords 
-            if keyword in student_text_lower
+        matched_count = self._count_keyword_matches(
+            expected_keywords,
+            artifacts.automaton,
+            student_lc
         )
         
         # Calculate keyword coverage
         keyword_score = matched_count / len(expected_keywords) if expected_keywords else 0
         
         # Word count factor (penalize very short essays)
-        word_count = len(student_answer.split())
+        word_count = len(student_lc.split())
         if word_count < 30:
             length_factor = 0.6
         elif word_count < 50:
@@ -163,21 +242,97 @@ class MockGrader(BaseGrader):
             'feedback': feedback
         }
     
+    @staticmethod
+    def _artifacts(question):
+        """Cached, student-independent preprocessing for a question."""
+        return _question_artifacts(
+            question.id,
+            question.expected_answer,
+            question.question_type
+        )
+    
+    @staticmethod
+    def _count_keyword_matches(keywords, automaton, text):
+        """
+        Number of keywords that occur as substrings of text.
+        With an Aho-Corasick automaton this is a single pass over the text
+        instead of one substring scan per keyword.
+        """
+        if automaton is None:
+            return sum(1 for keyword in keywords if keyword in text)
+        
+        found = {keyword for _, keyword in automaton.iter(text)}
+        return sum(1 for keyword in keywords if keyword in found)
+    
+    @staticmethod
+    def _similarity(a, b, cutoff=0.0):
+        """
+        Similarity ratio in [0, 1].
+        Uses RapidFuzz when installed, difflib.SequenceMatcher otherwise.
+        
+        Pairs that cannot reach cutoff return 0.0 early: RapidFuzz stops
+        once the cutoff is unreachable, and difflib's cheap upper bounds
+        skip the full O(n*m) ratio.
+        """
+        if a == b:
+            return 1.0
+        if fuzz is not None:
+            return fuzz.ratio(a, b, score_cutoff=cutoff * 100) / 100.0
+        
+        matcher = SequenceMatcher(None, a, b)
+        if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+            return 0.0
+        return matcher.ratio()
+    
     @staticmethod
     def _normalize_text(text):
         """Case-insensitive, whitespace-trimmed comparison."""
-        return re.sub(r'\s+', ' ', text.strip().lower())
+        return _WS_RE.sub(' ', text.strip().lower())
     
     @staticmethod
     def _extract_keywords(text):
         """
-        Extract significant words as keywords.
+        Extract significant words as keywords from already-lowercased text.
         Filters out common stopwords.
         """
-        stopwords = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'in', 'on', 
-                     'at', 'to', 'for', 'of', 'and', 'or', 'but'}
-        words = re.findall(r'\w+', text.lower())
-        return [w for w in words if len(w) > 3 and w not in stopwords]
+        words = _KEYWORD_RE.findall(text)
+        return [w for w in words if w not in _STOPWORDS]
+
+
+QuestionArtifacts = namedtuple(
+    'QuestionArtifacts',
+    ['normalized_expected', 'keywords', 'automaton']
+)
+
+
+@lru_cache(maxsize=4096)
+def _question_artifacts(question_id, expected_answer, question_type):
+    """
+    Preprocess the question side of grading once per question.
+    
+    The expected answer is identical for every student taking the exam, so
+    normalization and keyword extraction are memoized. The expected answer
+    and type are part of the key so an edited question is never graded
+    against stale artifacts.
+    """
+    if question_type == 'essay':
+        keywords = tuple(MockGrader._extract_keywords(expected_answer.lower()))
+        return QuestionArtifacts(None, keywords, _build_automaton(keywords))
+    
+    normalized_expected = MockGrader._normalize_text(expected_answer)
+    return QuestionArtifacts(normalized_expected, (), None)
+
+
+def _build_automaton(keywords):
+    """Aho-Corasick automaton over keywords, or None if unavailable."""
+    if ahocorasick is None or not keywords:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
 
 
 class GeminiGrader(BaseGrader):
@@ -187,6 +342,7 @@ class GeminiGrader(BaseGrader):
     
     Modular design allows swapping to Claude/OpenAI by changing client.
     """
+    max_workers = 8
     
     def __init__(self):
         try:
@@ -196,10 +352,13 @@ class GeminiGrader(BaseGrader):
                 raise ValueError("GEMINI_API_KEY not configured")
             
             genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
+            self.model = genai.GenerativeModel(
+                getattr(settings, 'GEMINI_MODEL', 'gemini-1.5-flash'),
+                system_instruction=_GRADER_SYSTEM_INSTRUCTION
+            )
             self.fallback_grader = MockGrader()
         except Exception as e:
-            print(f"Warning: Gemini initialization failed: {e}")
+            logger.warning("Gemini initialization failed: %s", e)
             self.model = None
             self.fallback_grader = MockGrader()
     
@@ -208,20 +367,108 @@ class GeminiGrader(BaseGrader):
         if not self.model:
             return self.fallback_grader.grade_answer(question, student_answer)
         
+        cache_key = self._cache_key(question, student_answer)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = self._build_grading_prompt(question, student_answer)
             response = self.model.generate_content(prompt)
             result = self._parse_llm_response(response.text, question.points)
-            return result
         except Exception as e:
-            print(f"LLM grading failed: {e}. Falling back to mock grader.")
+            logger.warning("LLM grading failed: %s. Falling back to mock grader.", e)
             return self.fallback_grader.grade_answer(question, student_answer)
+        
+        if result is None:
+            # Icase of Parsing error - return default failure (never cached)
+            return {
+                'is_correct': False,
+                'points_earned': 0,
+                'feedback': 'Grading error - could not parse LLM response'
+            }
+        
+        cache.set(cache_key, result, self._cache_timeout())
+        return result
+    
+    def grade_answers(self, items):
+        """
+        Grade all answers of a submission in a single LLM request.
+        Items missing from the batched response are graded individually.
+        """
+        if not self.model or not items:
+            return self.fallback_grader.grade_answers(items)
+        
+        # Answers graded before (same question, same normalized answer)
+        # are served from the cache and left out of the LLM request
+        cache_keys = [
+            self._cache_key(question, student_answer)
+            for question, student_answer in items
+        ]
+        cached = cache.get_many(cache_keys)
+        results = [cached.get(key) for key in cache_keys]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        pending_items = [items[i] for i in pending]
+        try:
+            prompt = self._build_batch_grading_prompt(pending_items)
+            response = self.model.generate_content(prompt)
+            graded = self._parse_batch_response(response.text, pending_items)
+        except Exception as e:
+            logger.warning("Batched LLM grading failed: %s. Grading answers individually.", e)
+            graded = [None] * len(pending_items)
+        
+        to_cache = {}
+        missing = []
+        for i, result in zip(pending, graded):
+            if result is None:
+                missing.append(i)
+            else:
+                results[i] = result
+                to_cache[cache_keys[i]] = result
+        if to_cache:
+            cache.set_many(to_cache, self._cache_timeout())
+        
+        # Grade whatever the batch did not cover with concurrent requests
+        retried = super().grade_answers([items[i] for i in missing])
+        for i, result in zip(missing, retried):
+            results[i] = result
+        
+        return results
+    
+    @staticmethod
+    def _cache_key(question, student_answer):
+        """
+        Cache key for an LLM grade.
+        Near-identical answers ("Mitochondria", "mitochondria.") share a key;
+        only trailing punctuation is dropped, so ".5" and "5" do not. The
+        question's wording, type, expected answer and points are hashed in
+        so editing a question invalidates its cached grades.
+        """
+        normalized = MockGrader._normalize_text(student_answer).rstrip('.!?,;: ')
+        digest = hashlib.sha1(
+            '\x1f'.join([
+                question.question_text,
+                question.question_type,
+                question.expected_answer,
+                str(question.points),
+                normalized,
+            ]).encode('utf-8')
+        ).hexdigest()
+        return f'llm-grade:{question.id}:{digest}'
+    
+    @staticmethod
+    def _cache_timeout():
+        return getattr(settings, 'GRADING_CACHE_TIMEOUT', 60 * 60 * 24)
     
     def _build_grading_prompt(self, question, student_answer):
-        """Construct prompt for LLM with strict JSON output requirement."""
-        return f"""You are an expert academic grader. Evaluate the student's answer fairly and objectively.
-
-Question Type: {question.question_type}
+        """
+        Construct prompt for LLM with strict JSON output requirement.
+        The grading rubric is supplied via the system instruction.
+        """
+        return f"""Question Type: {question.question_type}
 Question: {question.question_text}
 Expected Answer: {question.expected_answer}
 Maximum Points: {question.points}
@@ -234,39 +481,99 @@ CRITICAL: Respond ONLY with valid JSON in this exact format (no markdown, no bac
   "points_earned": <number between 0 and {question.points}>,
   "feedback": "<brief constructive feedback>"
 }}
+"""
+    
+    def _build_batch_grading_prompt(self, items):
+        """Construct one prompt covering every answer, keyed by position."""
+        payload = json.dumps({
+            'items': [
+                {
+                    'id': index,
+                    'question_type': question.question_type,
+                    'question': question.question_text,
+                    'expected_answer': question.expected_answer,
+                    'max_points': question.points,
+                    'student_answer': student_answer,
+                }
+                for index, (question, student_answer) in enumerate(items)
+            ]
+        })
+        return f"""Grade each student answer below.
 
-Grading Guidelines:
-- For multiple choice/true-false: Full points only for exact matches
-- For short answers: Full points if key concept is present, partial for close answers
-- For essays: Evaluate depth, accuracy, and coverage of key concepts
-- Be fair but rigorous. Award partial credit where appropriate.
+Items to grade (JSON):
+{payload}
+
+CRITICAL: Respond ONLY with a valid JSON array (no markdown, no backticks), one object per item:
+[
+  {{
+    "id": <id of the item>,
+    "is_correct": true or false,
+    "points_earned": <number between 0 and the item's max_points>,
+    "feedback": "<brief constructive feedback>"
+  }}
+]
 """
     
+    def _parse_batch_response(self, response_text, items):
+        """
+        Map a JSON array of graded items back onto items by id.
+        Returns a list aligned with items; entries the model omitted are None.
+        """
+        cleaned = self._strip_code_fences(response_text)
+        parsed = json_loads(cleaned)
+        
+        by_id = {
+            str(entry['id']): entry
+            for entry in parsed
+            if isinstance(entry, dict) and 'id' in entry
+        }
+        
+        results = []
+        for index, (question, _) in enumerate(items):
+            entry = by_id.get(str(index))
+            try:
+                result = self._sanitize_result(entry, question.points) if entry else None
+            except (TypeError, ValueError):
+                result = None
+            results.append(result)
+        return results
+    
+    @staticmethod
+    def _sanitize_result(result, max_points):
+        """Validate and clamp a single LLM grading result."""
+        is_correct = bool(result.get('is_correct', False))
+        points_earned = min(int(result.get('points_earned', 0)), max_points)
+        feedback = str(result.get('feedback', ''))
+        
+        return {
+            'is_correct': is_correct,
+            'points_earned': max(0, points_earned),
+            'feedback': feedback
+        }
+    
     def _parse_llm_response(self, response_text, max_points):
-        """Extract JSON from LLM response, handling markdown wrapping."""
+        """
+        Extract JSON from LLM response, handling markdown wrapping.
+        Returns None if the response cannot be parsed.
+        """
         # Clean potential markdown formatting
-        cleaned = re.sub(r'```json\s*|\s*```', '', response_text).strip()
+        cleaned = self._strip_code_fences(response_text)
         
         try:
-            result = json.loads(cleaned)
+            result = json_loads(cleaned)
             
             # Validate and sanitize output
-            is_correct = bool(result.get('is_correct', False))
-            points_earned = min(int(result.get('points_earned', 0)), max_points)
-            feedback = str(result.get('feedback', ''))
-            
-            return {
-                'is_correct': is_correct,
-                'points_earned': max(0, points_earned),
-                'feedback': feedback
-            }
-        except (json.JSONDecodeError, ValueError, KeyError) as e:
-            # Icase of Parsing error - return default failure
-            return {
-                'is_correct': False,
-                'points_earned': 0,
-                'feedback': 'Grading error - could not parse LLM response'
-            }
+            return self._sanitize_result(result, max_points)
+        except ValueError:
+            # json.JSONDecodeError is a ValueError, as is a bad points value
+            return None
+    
+    @staticmethod
+    def _strip_code_fences(response_text):
+        """Remove markdown fences; skipped when the model returned bare JSON."""
+        if '```' not in response_text:
+            return response_text.strip()
+        return _FENCE_RE.sub('', response_text).strip()
 
 
 class GradingService:
@@ -283,36 +590,126 @@ class GradingService:
         else:
             self.grader = MockGrader()
     
+    # Answers loaded, graded and written back per round
+    chunk_size = 200
+    
+    def grade_and_record(self, submission):
+        """
+        Grade a submission and save the outcome on it.
+        If grading fails, I'm saving submission as 'failed' rather than crashing.
+        Shared by the inline request path and the Celery task.
+        """
+        from .models import Submission
+        
+        # No 'grading' write here: inline grading finishes within the
+        # request, and the Celery task sets it when claiming the submission.
+        try:
+            total_score, max_possible = self.grade_submission(submission)
+            
+            # Update submission with results: a single UPDATE of the changed
+            # columns, mirrored on the instance for the caller's response
+            submission.score = total_score
+            submission.status = 'graded'
+            submission.graded_at = timezone.now()
+            Submission.objects.filter(pk=submission.pk).update(
+                score=submission.score,
+                status=submission.status,
+                graded_at=submission.graded_at,
+                grading_report=submission.grading_report,
+            )
+        except Exception as e:
+            # If grading fails, mark as failed but don't crash
+            submission.status = 'failed'
+            Submission.objects.filter(pk=submission.pk).update(status='failed')
+            logger.error("Grading failed for submission %s: %s", submission.id, e)
+    
     def grade_submission(self, submission):
         """
         Grades all answers in a submission.
-        Uses transaction safety to ensure atomicity.
+        
+        Chunks are graded outside any transaction, so no rows are locked
+        while the grader (possibly an LLM over HTTP) runs; the results are
+        then written in one short atomic block, all answers or none.
+        
+        Per-answer feedback is collected into submission.grading_report;
+        the caller persists it together with the score.
         
         Returns: (total_score, max_possible_score)
         """
         from .models import Answer
         
-        # Fetch all answers with related questions in one query
-        answers = submission.answers.select_related('question').all()
+        # Denormalized on the exam, no need to add up question points
+        max_possible = submission.exam.max_possible_score
+        
+        # Answers with related questions, loading only the columns the
+        # graders actually read
+        answers = submission.answers.select_related('question').only(
+            'id',
+            'student_answer',
+            'question',
+            'question__question_text',
+            'question__question_type',
+            'question__expected_answer',
+            'question__points',
+        ).order_by('pk')
         
         total_score = 0
-        max_possible = 0
+        grading_report = {}
+        now = timezone.now()
         
-        for answer in answers:
-            # Grade individual answer
-            result = self.grader.grade_answer(
-                answer.question, 
-                answer.student_answer
-            )
+        graded = []
+        for chunk in self._iter_chunks(answers, self.chunk_size):
+            # Let the strategy grade the chunk at once; graders that can
+            # batch (e.g. a single LLM request) do so behind this call
+            results = self.grader.grade_answers([
+                (answer.question, answer.student_answer)
+                for answer in chunk
+            ])
             
-            # Update answer with grading results
-            answer.is_correct = result['is_correct']
-            answer.points_earned = result['points_earned']
-            answer.feedback = result.get('feedback', '')
-            answer.graded_at = timezone.now()
-            answer.save()
-            
-            total_score += result['points_earned']
-            max_possible += answer.question.points
+            for answer, result in zip(chunk, results):
+                # Only the written columns are kept, so graded chunks
+                # don't hold on to their questions until the write
+                graded.append(Answer(
+                    id=answer.id,
+                    is_correct=result['is_correct'],
+                    points_earned=result['points_earned'],
+                    graded_at=now,
+                ))
+                
+                grading_report[str(answer.id)] = {
+                    'is_correct': result['is_correct'],
+                    'points_earned': result['points_earned'],
+                    'feedback': result.get('feedback', ''),
+                }
+                
+                total_score += result['points_earned']
+        
+        # Multi-row UPDATEs instead of a save() per answer; feedback only
+        # goes to the submission's grading report
+        with transaction.atomic():
+            Answer.objects.bulk_update(
+                graded,
+                ['is_correct', 'points_earned', 'graded_at'],
+                batch_size=self.chunk_size
+            )
+        
+        submission.grading_report = grading_report
+        return total_score, max_possible
+    
+    @staticmethod
+    def _iter_chunks(queryset, size):
+        """
+        Yield a pk-ordered queryset in lists of at most size rows.
         
-        return total_score, max_possible
\ No newline at end of file
+        Keyset pages (pk > last seen) keep memory bounded for large exams
+        without holding a cursor open while the same rows are updated.
+        """
+        last_pk = None
+        while True:
+            page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            chunk = list(page[:size])
+            if chunk:
+                yield chunk
+            if len(chunk) < size:
+                return
+            last_pk = chunk[-1].pk
@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import string
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+def queue_handler(queue, handlers, respect_handler_level=True):
+    """
+    dictConfig factory for a QueueHandler whose QueueListener drains into
+    the named handlers (which must sort before this one in LOGGING, as
+    dictConfig configures handlers alphabetically).
+
+    The listener is kept on the handler, which keeps the otherwise
+    unattached target handlers alive; AssessmentsConfig.ready() starts it.
+    """
+    targets = [logging._handlers[name] for name in handlers]
+    handler = QueueHandler(queue)
+    handler.listener = QueueListener(
+        queue, *targets, respect_handler_level=respect_handler_level
+    )
+    return handler
+
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that creates the log directory when the file is
+    first opened (use with delay=True), instead of at every process start.
+    """
+    
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class FastFormatter(logging.Formatter):
+    """
+    '{'-style formatter that splits its format string into (literal, field)
+    pairs once, then renders records with a plain join of record attributes.
+    
+    Only bare '{field}' references are supported; format strings using
+    conversions or format specs fall back to the stdlib rendering.
+    """
+    
+    def __init__(self, fmt, datefmt=None):
+        super().__init__(fmt, datefmt, style='{')
+        parsed = list(string.Formatter().parse(fmt))
+        if any(spec or conversion for _, _, spec, conversion in parsed):
+            self._parts = None
+        else:
+            self._parts = tuple((literal, field) for literal, field, _, _ in parsed)
+    
+    def formatMessage(self, record):
+        # format() has already set record.message and record.asctime
+        if self._parts is None:
+            return super().formatMessage(record)
+        attrs = record.__dict__
+        return ''.join([
+            literal if field is None else literal + str(attrs[field])
+            for literal, field in self._parts
+        ])
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as a single-line JSON object holding the given
+    record attributes (plus exception/stack text when present), so log
+    shippers can ingest the file without parsing free-form text.
+    """
+    
+    def __init__(self, fields=('levelname', 'asctime', 'module', 'message'), datefmt=None):
+        super().__init__(datefmt=datefmt)
+        self.fields = tuple(fields)
+    
+    def usesTime(self):
+        return 'asctime' in self.fields
+    
+    def format(self, record):
+        record.message = record.getMessage()
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        payload = {field: getattr(record, field) for field in self.fields}
+        
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc_info'] = record.exc_text
+        if record.stack_info:
+            payload['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str)
@@ -0,0 +1,14 @@
+from django.middleware.gzip import GZipMiddleware
+
+
+class SafeMethodGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware limited to GET/HEAD responses. Login and registration
+    answer POSTs with the auth token next to user-supplied fields, the
+    pattern BREACH exploits, so those are sent uncompressed.
+    """
+    
+    def process_response(self, request, response):
+        if request.method not in ('GET', 'HEAD'):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,22 @@
+import apps.assessments.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0002_submission_grading_report'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submission',
+            name='id',
+            field=models.UUIDField(default=apps.assessments.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='answer',
+            name='id',
+            field=models.UUIDField(default=apps.assessments.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_max_possible_score(apps, schema_editor):
+    Exam = apps.get_model('assessments', 'Exam')
+    Question = apps.get_model('assessments', 'Question')
+    totals = Question.objects.filter(exam=OuterRef('pk')).values('exam').annotate(
+        total=Sum('points')
+    ).values('total')
+    Exam.objects.update(max_possible_score=Coalesce(Subquery(totals), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0004_converge_uuid_schema'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='max_possible_score',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_max_possible_score, migrations.RunPython.noop),
+    ]
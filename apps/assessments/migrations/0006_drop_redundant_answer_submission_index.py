@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 20:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0005_exam_max_possible_score'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='answer',
+            name='answers_submiss_1e8504_idx',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-15 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0006_drop_redundant_answer_submission_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='submission',
+            name='submissions_student_02388e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['-created_at', '-id'], name='exams_created_81f701_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', '-submitted_at', '-id'], name='submissions_student_6d7929_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0007_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['exam', 'id'], name='questions_exam_id_8f57a9_idx'),
+        ),
+    ]
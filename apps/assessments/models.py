@@ -1,3 +1,5 @@
+import os
+import time
 import uuid
 from django.db import models
 from django.contrib.auth.models import AbstractUser
@@ -5,6 +7,23 @@ from django.core.validators import MinValueValidator
 from django.utils import timezone
 
 
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7).
+    
+    The leading 48 bits are a millisecond Unix timestamp, so keys generated
+    on the hot insert path (submissions, answers) append to the right edge
+    of their B-tree indexes instead of landing on a random page like uuid4.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= int.from_bytes(os.urandom(10), 'big')
+    # Version (7) and RFC 4122 variant bits
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
 class User(AbstractUser):
     # AbstractUser already has first_name and last_name
     # We'll use those instead of full_name
@@ -24,15 +43,34 @@ class Exam(models.Model):
     duration_minutes = models.IntegerField(validators=[MinValueValidator(1)])
     instructions = models.TextField(blank=True)
     passing_score = models.IntegerField(null=True, blank=True)
+    # Sum of question points, kept current by Question save/delete signals
+    max_possible_score = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'exams'
         ordering = ['-created_at']
+        # Matches the exam list's cursor pagination order
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.course} - {self.title}"
+    
+    def save(self, *args, **kwargs):
+        # max_possible_score is written by the Question signals alone; an
+        # instance loaded before its questions changed must not reset it
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname != 'max_possible_score'
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
 
 
 class Question(models.Model):
@@ -62,6 +100,9 @@ class Question(models.Model):
         # I added an index here to optimize queries when fetching exam questions
         indexes = [
             models.Index(fields=['exam', 'order']),
+            # Submission validation counts exam_id = ? AND id IN (...)
+            # straight from the index
+            models.Index(fields=['exam', 'id']),
         ]
     
     def __str__(self):
@@ -76,7 +117,7 @@ class Submission(models.Model):
     The unique constraint enforces one-submission-per-exam-per-student, which is 
     a business rule I implemented to prevent accidental resubmission.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     STATUS_CHOICES = [
         ('submitted', 'Submitted'),
         ('grading', 'Grading'),
@@ -104,6 +145,9 @@ class Submission(models.Model):
     submitted_at = models.DateTimeField(default=timezone.now)
     graded_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Per-answer grading output keyed by answer id, written in one go with the
+    # score so grading doesn't rewrite a feedback TEXT column on every answer
+    grading_report = models.JSONField(default=dict, blank=True)
     
     class Meta:
         db_table = 'submissions'
@@ -117,7 +161,8 @@ class Submission(models.Model):
         ]
         # Critical indexes for result retrieval queries
         indexes = [
-            models.Index(fields=['student', '-submitted_at']),
+            # id breaks submitted_at ties for the list's cursor pagination
+            models.Index(fields=['student', '-submitted_at', '-id']),
             models.Index(fields=['exam']),
             models.Index(fields=['status']),
         ]
@@ -136,7 +181,7 @@ class Answer(models.Model):
     - Partial credit tracking
     - Efficient JOIN queries during result retrieval
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     submission = models.ForeignKey(
         Submission, 
         on_delete=models.CASCADE, 
@@ -155,9 +200,9 @@ class Answer(models.Model):
     
     class Meta:
         db_table = 'answers'
-        # Index for efficient answer retrieval during grading
+        # Lookups by submission use the unique (submission, question)
+        # constraint below, whose leading column is submission
         indexes = [
-            models.Index(fields=['submission']),
             models.Index(fields=['question']),
         ]
         # Ensure one answer per question per submission
@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ExamCursorPagination(CursorPagination):
+    """
+    Keyset pages over (created_at, id): each page is an index range scan
+    instead of an OFFSET that grows with the page number, and new exams
+    never shift rows between pages.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+
+
+class SubmissionCursorPagination(CursorPagination):
+    """Keyset pages over a student's (submitted_at, id) index."""
+    ordering = ('-submitted_at', '-id')
+    page_size = 20
@@ -10,5 +10,5 @@ class IsSubmissionOwner(permissions.BasePermission):
     """
     
     def has_object_permission(self, request, view, obj):
-        # Assume 'obj' has a 'student' attribute that references the user who owns the submission
-        return obj.student == request.user
\ No newline at end of file
+        # Compare keys so the student row never has to be loaded
+        return obj.student_id == request.user.pk
\ No newline at end of file
@@ -1,5 +1,8 @@
+import uuid
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from drf_spectacular.utils import extend_schema_field
 from .models import Exam, Question, Submission, Answer
 
 User = get_user_model()
@@ -59,38 +62,87 @@ class ExamDetailSerializer(serializers.ModelSerializer):
 
 class AnswerSubmissionSerializer(serializers.Serializer):
     """
-    Validate incoming answer data during submission.
+    Shape of one submitted answer, for the API schema only; the answers
+    themselves are validated by SubmissionCreateSerializer.validate_answers.
     """
     question_id = serializers.UUIDField()
     student_answer = serializers.CharField(allow_blank=False)
 
 
+@extend_schema_field(AnswerSubmissionSerializer(many=True))
+class AnswerListField(serializers.ListField):
+    child = serializers.DictField()
+
+
 class SubmissionCreateSerializer(serializers.Serializer):
     """
     Handle exam submission payload seperately.
+    
+    Answers are validated in one loop over plain dicts rather than through
+    a nested serializer per answer, which dominated large submissions.
+    Each validated answer is {'question_id': UUID, 'student_answer': str}.
     """
     exam_id = serializers.UUIDField()
-    answers = AnswerSubmissionSerializer(many=True)
+    answers = AnswerListField(min_length=1)
     
     def validate_answers(self, value):
-        """I'm ensuring no duplicate question_ids in submission."""
-        question_ids = [a['question_id'] for a in value]
-        if len(question_ids) != len(set(question_ids)):
-            raise serializers.ValidationError(
-                "Duplicate answers for the same question are not allowed."
-            )
-        return value
+        """Type-check each answer and reject duplicate question_ids."""
+        cleaned = []
+        seen = set()
+        for index, item in enumerate(value):
+            if not isinstance(item, dict):
+                raise serializers.ValidationError(f"Answer {index}: must be an object.")
+            try:
+                question_id = uuid.UUID(str(item['question_id']))
+            except (KeyError, ValueError):
+                raise serializers.ValidationError(
+                    f"Answer {index}: question_id must be a valid UUID."
+                )
+            
+            student_answer = item.get('student_answer')
+            # Numbers are accepted as CharField does; booleans are not
+            if isinstance(student_answer, (int, float)) and not isinstance(student_answer, bool):
+                student_answer = str(student_answer)
+            elif student_answer is not None and not isinstance(student_answer, str):
+                raise serializers.ValidationError(
+                    f"Answer {index}: student_answer must be a string."
+                )
+            if not student_answer or not student_answer.strip():
+                raise serializers.ValidationError(
+                    f"Answer {index}: student_answer may not be blank."
+                )
+            
+            if question_id in seen:
+                raise serializers.ValidationError(
+                    "Duplicate answers for the same question are not allowed."
+                )
+            seen.add(question_id)
+            cleaned.append({
+                'question_id': question_id,
+                'student_answer': student_answer.strip()
+            })
+        return cleaned
 
 
 class AnswerDetailSerializer(serializers.ModelSerializer):
     question_text = serializers.CharField(source='question.question_text', read_only=True)
     question_type = serializers.CharField(source='question.question_type', read_only=True)
     points_possible = serializers.IntegerField(source='question.points', read_only=True)
+    feedback = serializers.SerializerMethodField()
     
     class Meta:
         model = Answer
         fields = ['id', 'question_text', 'question_type', 'student_answer', 
                   'is_correct', 'points_earned', 'points_possible', 'feedback']
+    
+    @extend_schema_field(serializers.CharField())
+    def get_feedback(self, obj):
+        """
+        Feedback is stored in the submission's grading report.
+        Answers graded before the report existed still carry it themselves.
+        """
+        entry = obj.submission.grading_report.get(str(obj.id))
+        return entry['feedback'] if entry else obj.feedback
 
 
 class SubmissionListSerializer(serializers.ModelSerializer):
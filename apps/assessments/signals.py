@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache_key
+from .models import Exam, Question, User
+
+
+@receiver([post_save, post_delete], sender=Question)
+def refresh_exam_max_possible_score(sender, instance, **kwargs):
+    """
+    Keep Exam.max_possible_score equal to the sum of its question points.
+    Questions change rarely (admin edits), so recomputing here saves every
+    submission and grading run from adding the points up again.
+    """
+    total = Question.objects.filter(exam_id=instance.exam_id).aggregate(
+        total=Sum('points')
+    )['total']
+    Exam.objects.filter(pk=instance.exam_id).update(max_possible_score=total or 0)
+
+
+# Cached exam-list responses are keyed by this counter; bumping it
+# orphans every cached page at once.
+EXAM_LIST_VERSION_KEY = 'exam-list:version'
+
+
+@receiver([post_save, post_delete], sender=Exam)
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_exam_list_cache(sender, **kwargs):
+    """Exams and their question counts feed the cached exam listing."""
+    try:
+        cache.incr(EXAM_LIST_VERSION_KEY)
+    except ValueError:
+        cache.set(EXAM_LIST_VERSION_KEY, 1, None)
+
+
+def exam_detail_cache_key(exam_id):
+    return f'exam-detail-page:{exam_id}'
+
+
+@receiver([post_save, post_delete], sender=Exam)
+def invalidate_exam_detail_cache(sender, instance, **kwargs):
+    cache.delete(exam_detail_cache_key(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_exam_detail_cache_for_question(sender, instance, **kwargs):
+    cache.delete(exam_detail_cache_key(instance.exam_id))
+
+
+@receiver([post_save, post_delete], sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """A rotated or revoked token must stop authenticating at once."""
+    cache.delete(token_cache_key(instance.key))
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user_tokens(sender, instance, created, **kwargs):
+    """Cached tokens carry a copy of the user (password, is_active)."""
+    if created or not settings.AUTH_TOKEN_CACHE_TIMEOUT:
+        return
+    keys = Token.objects.filter(user_id=instance.pk).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
@@ -0,0 +1,36 @@
+"""
+Celery tasks for grading outside the request cycle.
+Enabled with GRADING_ASYNC; requires Celery and a broker.
+"""
+from celery import shared_task
+from django.db import OperationalError
+
+from .grading_service import GradingService
+from .models import Submission
+
+
+@shared_task(bind=True, max_retries=3)
+def grade_submission_task(self, submission_id):
+    """
+    Grade a submission on a worker.
+    
+    The submission is claimed by a conditional UPDATE from 'submitted' to
+    'grading', so a duplicated or retried task can never grade it twice,
+    and no transaction or row lock is held while the grader runs.
+    Transient database errors (lost connection, lock timeout) before the
+    claim are retried with exponential backoff; grading errors themselves
+    are recorded as status='failed' by grade_and_record.
+    """
+    try:
+        submission = Submission.objects.select_related('exam').get(pk=submission_id)
+        claimed = Submission.objects.filter(
+            pk=submission_id, status='submitted'
+        ).update(status='grading')
+    except OperationalError as exc:
+        raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+    
+    if not claimed:
+        return
+    
+    submission.status = 'grading'
+    GradingService().grade_and_record(submission)
@@ -7,6 +7,7 @@ from .views import (
     SubmissionCreateView,
     SubmissionListView,
     SubmissionDetailView,
+    SubmissionStatusView,
 )
 
 urlpatterns = [
@@ -16,10 +17,11 @@ urlpatterns = [
     
     # Exams
     path('exams/', ExamListView.as_view(), name='exam-list'),
-    path('exams/<int:pk>/', ExamDetailView.as_view(), name='exam-detail'),
+    path('exams/<uuid:pk>/', ExamDetailView.as_view(), name='exam-detail'),
     
     # Submissions
     path('submissions/', SubmissionCreateView.as_view(), name='submission-create'),
     path('submissions/mine/', SubmissionListView.as_view(), name='submission-list'),
-    path('submissions/<int:pk>/', SubmissionDetailView.as_view(), name='submission-detail'),
+    path('submissions/<uuid:pk>/', SubmissionDetailView.as_view(), name='submission-detail'),
+    path('submissions/<uuid:pk>/status/', SubmissionStatusView.as_view(), name='submission-status'),
 ]
\ No newline at end of file
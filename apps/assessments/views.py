@@ -1,11 +1,20 @@
+import hashlib
+import json
+
 from rest_framework import status, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.authtoken.models import Token
+from django.conf import settings
 from django.contrib.auth import authenticate
-from django.db import transaction
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Prefetch
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
@@ -20,7 +29,66 @@ from .serializers import (
     SubmissionDetailSerializer,
 )
 from .grading_service import GradingService
+from .pagination import ExamCursorPagination, SubmissionCursorPagination
 from .permissions import IsSubmissionOwner
+from .signals import EXAM_LIST_VERSION_KEY, exam_detail_cache_key
+
+
+def _get_token_key(user):
+    """
+    Auth token key for user: one narrow SELECT when it exists (the usual
+    login). Only a miss falls back to get_or_create, which recovers when a
+    concurrent first login inserts the token first.
+    """
+    key = Token.objects.filter(user=user).values_list('key', flat=True).first()
+    return key or Token.objects.get_or_create(user=user)[0].key
+
+
+class CachedResponseMixin:
+    """
+    Serves response data from the Django cache along with an ETag computed
+    when the entry was filled, so conditional requests from clients that
+    already hold the payload get a 304 without it being rendered again.
+    A timeout of 0 skips the cache, leaving the ETag to
+    ConditionalGetMiddleware, which hashes the rendered body.
+    """
+    
+    def cached_response(self, request, key, timeout, build):
+        if not timeout:
+            return Response(build())
+        
+        entry = cache.get(key)
+        if entry is None:
+            data = build()
+            body = json.dumps(data, sort_keys=True, default=str).encode()
+            entry = (data, quote_etag(hashlib.md5(body).hexdigest()))
+            cache.set(key, entry, timeout)
+        
+        data, etag = entry
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = Response(data)
+        response['ETag'] = etag
+        return response
+
+
+class ValuesListMixin:
+    """
+    For list views whose serializer is a flat projection of queryset
+    columns. Rows come straight from .values() over the serializer's
+    Meta.fields, skipping a model and serializer instance per row;
+    serializer_class still drives the OpenAPI schema.
+    """
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *self.get_serializer_class().Meta.fields
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(queryset))
 
 
 @extend_schema(
@@ -90,7 +158,8 @@ class RegisterView(APIView):
         if serializer.is_valid():
             user = serializer.save()
 
-            token, _ = Token.objects.get_or_create(user=user)
+            # Brand-new user, so there is no token to look up
+            token = Token.objects.create(user=user)
             return Response({
                 'username': user.username,
                 'email': user.email,
@@ -150,11 +219,24 @@ class RegisterView(APIView):
                     }
                 }
             }
+        },
+        429: {
+            'description': 'Too many login attempts from this IP',
+            'content': {
+                'application/json': {
+                    'example': {
+                        'detail': 'Request was throttled. Expected available in 42 seconds.'
+                    }
+                }
+            }
         }
     }
 )
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    # Throttled before authenticate() runs its deliberately slow hash
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'login'
     
     def post(self, request):
         username = request.data.get('username')
@@ -169,9 +251,8 @@ class LoginView(APIView):
         user = authenticate(username=username, password=password)
         
         if user:
-            token, _ = Token.objects.get_or_create(user=user)
             return Response({
-                'token': token.key,
+                'token': _get_token_key(user),
                 'username': user.username
             })
         
@@ -192,8 +273,8 @@ class LoginView(APIView):
     preventing N+1 query problems even with hundreds of exams.
     
     **Pagination:**
-    - Default page size: 20 items
-    - Use `?page=2` to get subsequent pages
+    - Cursor-based, newest first, 20 items per page
+    - Follow the `next`/`previous` links to move between pages
     ''',
     responses={
         200: {
@@ -201,7 +282,6 @@ class LoginView(APIView):
             'content': {
                 'application/json': {
                     'example': {
-                        'count': 2,
                         'next': None,
                         'previous': None,
                         'results': [
@@ -238,19 +318,31 @@ class LoginView(APIView):
         }
     }
 )
-class ExamListView(generics.ListAPIView):
+class ExamListView(CachedResponseMixin, ValuesListMixin, generics.ListAPIView):
     """
     List all available exams.
     Ensure the calculation of question_count is done at database level to prevent N+1 queries.
     """
     permission_classes = [IsAuthenticated]
     serializer_class = ExamListSerializer
+    pagination_class = ExamCursorPagination
     
-    def get_queryset(self):
-        from django.db.models import Count
-        return Exam.objects.annotate(
-            question_count=Count('questions')
-        ).all()
+    # Ordering is applied by the cursor paginator
+    queryset = Exam.objects.annotate(question_count=Count('questions'))
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Exams change rarely and the listing is the same for every student,
+        so rendered pages are cached. Exam/Question signals bump the
+        version in the key, which invalidates all pages on any edit.
+        """
+        version = cache.get(EXAM_LIST_VERSION_KEY, 0)
+        return self.cached_response(
+            request,
+            f'exam-list-page:{version}:{request.build_absolute_uri()}',
+            settings.EXAM_LIST_CACHE_TIMEOUT,
+            lambda: super(ExamListView, self).list(request, *args, **kwargs).data,
+        )
 
 
 @extend_schema(
@@ -321,13 +413,34 @@ class ExamListView(generics.ListAPIView):
         }
     }
 )
-class ExamDetailView(generics.RetrieveAPIView):
+class ExamDetailView(CachedResponseMixin, generics.RetrieveAPIView):
     """
     Get exam with questions for take-exam view.
     """
     permission_classes = [IsAuthenticated]
     serializer_class = ExamDetailSerializer
-    queryset = Exam.objects.prefetch_related('questions').all()
+    # Only the columns QuestionSerializer renders (plus the exam FK the
+    # prefetch joins on); expected_answer stays in the database.
+    queryset = Exam.objects.prefetch_related(
+        Prefetch(
+            'questions',
+            queryset=Question.objects.only(
+                'id', 'exam', 'question_text', 'question_type', 'points', 'order'
+            )
+        )
+    )
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Every student taking an exam loads the same payload, so it is
+        cached per exam; Exam/Question signals delete the entry on edit.
+        """
+        return self.cached_response(
+            request,
+            exam_detail_cache_key(kwargs[self.lookup_field]),
+            settings.EXAM_DETAIL_CACHE_TIMEOUT,
+            lambda: super(ExamDetailView, self).retrieve(request, *args, **kwargs).data,
+        )
     lookup_field = 'pk'
 
 
@@ -349,14 +462,21 @@ class ExamDetailView(generics.RetrieveAPIView):
     3. Status updated to 'graded' with total score
     4. If grading fails, status='failed' (submission is not lost)
     
+    With `GRADING_ASYNC` enabled, steps 2-4 run on a Celery worker: the
+    response is 202 with status='submitted', and clients poll the
+    submission detail endpoint until status is 'graded'.
+    
     **Important:**
     - You must answer ALL questions in the exam
     - Each question_id must be from the specified exam
     - You cannot submit the same exam twice
     ''',
-    request={
-        'application/json': {
-            'example': {
+    request=SubmissionCreateSerializer,
+    examples=[
+        OpenApiExample(
+            'Submission',
+            request_only=True,
+            value={
                 'exam_id': '550e8400-e29b-41d4-a716-446655440000',
                 'answers': [
                     {
@@ -369,8 +489,8 @@ class ExamDetailView(generics.RetrieveAPIView):
                     }
                 ]
             }
-        }
-    },
+        )
+    ],
     responses={
         201: {
             'description': 'Submission successful',
@@ -384,6 +504,18 @@ class ExamDetailView(generics.RetrieveAPIView):
                 }
             }
         },
+        202: {
+            'description': 'Submission accepted, grading queued (GRADING_ASYNC)',
+            'content': {
+                'application/json': {
+                    'example': {
+                        'submission_id': '950e8400-e29b-41d4-a716-446655440000',
+                        'status': 'submitted',
+                        'message': 'Submission received and queued for grading'
+                    }
+                }
+            }
+        },
         400: {
             'description': 'Validation error',
             'content': {
@@ -398,7 +530,8 @@ class ExamDetailView(generics.RetrieveAPIView):
                         'invalid_question': {
                             'summary': 'Question not in exam',
                             'value': {
-                                'error': 'Invalid question_id: 750e8400-e29b-41d4-a716-446655440000 for exam 550e8400-e29b-41d4-a716-446655440000'
+                                'error': 'Invalid question_ids for exam 550e8400-e29b-41d4-a716-446655440000',
+                                'ids': ['750e8400-e29b-41d4-a716-446655440000']
                             }
                         },
                         'duplicate_answers': {
@@ -410,7 +543,7 @@ class ExamDetailView(generics.RetrieveAPIView):
                         'missing_answer': {
                             'summary': 'Empty answer',
                             'value': {
-                                'answers': [{'student_answer': ['This field may not be blank.']}]
+                                'answers': ['Answer 0: student_answer may not be blank.']
                             }
                         }
                     }
@@ -437,11 +570,10 @@ class SubmissionCreateView(APIView):
     - Infer Identity from request.user (so no user_id would be exposed in payload)
     - Validate all questions before creating submission
     - Prevent duplicate submissions using unique constraint
-    - Make everything transactional so it's either all-or-nothing writes
+    - Make the writes transactional so it's either all-or-nothing
     """
     permission_classes = [IsAuthenticated]
     
-    @transaction.atomic
     def post(self, request):
         serializer = SubmissionCreateSerializer(data=request.data)
         
@@ -453,74 +585,75 @@ class SubmissionCreateView(APIView):
         
         exam = get_object_or_404(Exam, pk=exam_id)
         
-        exam_questions = {q.id: q for q in exam.questions.all()}
+        # The database counts how many submitted IDs belong to the exam
+        # (IDs are unique, checked by the serializer); only a mismatch pays
+        # for fetching the IDs to report every foreign question at once
+        submitted_ids = [answer_data['question_id'] for answer_data in answers_data]
+        valid_count = exam.questions.filter(id__in=submitted_ids).count()
+        if valid_count != len(submitted_ids):
+            exam_question_ids = set(
+                exam.questions.filter(id__in=submitted_ids).values_list('id', flat=True)
+            )
+            invalid_ids = [qid for qid in submitted_ids if qid not in exam_question_ids]
+            return Response(
+                {'error': f'Invalid question_ids for exam {exam_id}', 'ids': invalid_ids}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for answer_data in answers_data:
-            qid = answer_data['question_id']
-            if qid not in exam_questions:
-                return Response(
-                    {'error': f'Invalid question_id: {qid} for exam {exam_id}'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        max_score = exam.max_possible_score
         
-        if Submission.objects.filter(student=request.user, exam=exam).exists():
+        # Only the writes run in a transaction; the reads above autocommit.
+        # Create submission (identity from request.user, not payload).
+        # Duplicates are rejected by the (student, exam) unique constraint
+        # rather than a racy pre-check, rolling back the whole block.
+        try:
+            with transaction.atomic():
+                submission = Submission.objects.create(
+                    student=request.user,
+                    exam=exam,
+                    status='submitted',
+                    submitted_at=timezone.now(),
+                    max_possible_score=max_score
+                )
+                
+                answer_objects = [
+                    Answer(
+                        submission=submission,
+                        question_id=ans['question_id'],
+                        student_answer=ans['student_answer']
+                    )
+                    for ans in answers_data
+                ]
+                Answer.objects.bulk_create(answer_objects)
+        except IntegrityError:
             return Response(
                 {'error': 'You have already submitted this exam'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        max_score = sum(q.points for q in exam_questions.values())
-        
-        # Create submission (identity from request.user, not payload)
-        submission = Submission.objects.create(
-            student=request.user,
-            exam=exam,
-            status='submitted',
-            submitted_at=timezone.now(),
-            max_possible_score=max_score
-        )
-        
-        answer_objects = [
-            Answer(
-                submission=submission,
-                question=exam_questions[ans['question_id']],
-                student_answer=ans['student_answer']
+        if settings.GRADING_ASYNC:
+            # Hand grading to a Celery worker (runs at once, as the rows are
+            # already committed, or at commit under ATOMIC_REQUESTS)
+            from .tasks import grade_submission_task
+            transaction.on_commit(
+                lambda: grade_submission_task.delay(str(submission.id))
             )
-            for ans in answers_data
-        ]
-        Answer.objects.bulk_create(answer_objects)
-        
-        # Trigger grading (synchronous for now - can be made async with Celery)
-        self._grade_submission(submission)
+            message = 'Submission received and queued for grading'
+            response_status = status.HTTP_202_ACCEPTED
+        else:
+            # Graded after commit, so no transaction is held open while
+            # grading; a failure leaves the saved submission as 'failed'
+            GradingService().grade_and_record(submission)
+            message = 'Submission received and graded successfully'
+            response_status = status.HTTP_201_CREATED
         
+        # Built from the in-memory instance (grade_and_record mirrors its
+        # UPDATE onto it), so no refresh or serializer pass is needed
         return Response({
             'submission_id': submission.id,
             'status': submission.status,
-            'message': 'Submission received and graded successfully'
-        }, status=status.HTTP_201_CREATED)
-    
-    def _grade_submission(self, submission):
-        """
-        If grading fails, I'm saving submission as 'failed' rather than crashing.
-        In an actual production env, this should be an async Celery task.
-        """
-        try:
-            submission.status = 'grading'
-            submission.save()
-            
-            grading_service = GradingService()
-            total_score, max_possible = grading_service.grade_submission(submission)
-            
-            # Update submission with results
-            submission.score = total_score
-            submission.status = 'graded'
-            submission.graded_at = timezone.now()
-            submission.save()
-        except Exception as e:
-            # If grading fails, mark as failed but don't crash
-            submission.status = 'failed'
-            submission.save()
-            print(f"Grading failed for submission {submission.id}: {str(e)}")
+            'message': message
+        }, status=response_status)
 
 
 @extend_schema(
@@ -535,7 +668,8 @@ class SubmissionCreateView(APIView):
     - No way to access other students' data
     
     **Ordered by:**
-    Most recent submissions first (descending by submitted_at)
+    Most recent submissions first (descending by submitted_at), in cursor
+    pages of 20: follow the `next`/`previous` links
     ''',
     responses={
         200: {
@@ -543,7 +677,6 @@ class SubmissionCreateView(APIView):
             'content': {
                 'application/json': {
                     'example': {
-                        'count': 2,
                         'next': None,
                         'previous': None,
                         'results': [
@@ -572,7 +705,7 @@ class SubmissionCreateView(APIView):
         }
     }
 )
-class SubmissionListView(generics.ListAPIView):
+class SubmissionListView(ValuesListMixin, generics.ListAPIView):
     """
     List student's own submissions.
     
@@ -580,11 +713,17 @@ class SubmissionListView(generics.ListAPIView):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = SubmissionListSerializer
+    pagination_class = SubmissionCursorPagination
     
     def get_queryset(self):
+        # Exam columns are pulled up under the serializer's field names so
+        # ValuesListMixin can select exactly SubmissionListSerializer's fields
         return Submission.objects.filter(
             student=self.request.user
-        ).select_related('exam').order_by('-submitted_at')
+        ).annotate(
+            exam_title=F('exam__title'),
+            course=F('exam__course')
+        )
 
 
 @extend_schema(
@@ -600,8 +739,9 @@ class SubmissionListView(generics.ListAPIView):
     
     **Query Optimization:**
     This endpoint uses aggressive query optimization:
-    - select_related() for exam data (single JOIN)
-    - prefetch_related() for answers + questions (1 additional query)
+    - select_related() for exam data (single JOIN; ownership uses student_id, no user JOIN)
+    - prefetch_related() for answers joined to their questions (1 additional query)
+    - Only the rendered answer/question columns are loaded (no expected answers)
     - Total: 2 queries regardless of number of answers
     
     **Use this to:**
@@ -692,9 +832,139 @@ class SubmissionDetailView(generics.RetrieveAPIView):
     def get_queryset(self):
         base_queryset = Submission.objects.all()
         
+        # Answers carry only what AnswerDetailSerializer renders; the
+        # submission FK must stay loaded or each row refetches its parent.
+        answers = Answer.objects.select_related('question').only(
+            'id', 'submission_id', 'question_id', 'student_answer',
+            'is_correct', 'points_earned', 'feedback',
+            'question__id', 'question__question_text',
+            'question__question_type', 'question__points'
+        )
+        
+        # No student join: ownership is checked against student_id
         return base_queryset.select_related(
-            'exam',     
-            'student'   
+            'exam'
         ).prefetch_related(
-            'answers__question' 
-        )
\ No newline at end of file
+            Prefetch('answers', queryset=answers)
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Conditional GET for clients polling for results.
+        
+        Once graded a submission never changes, so its status and
+        graded_at identify the representation. Requests carrying
+        If-None-Match are answered from one narrow query, returning 304
+        without loading answers or questions.
+        
+        No Last-Modified is sent: it has one-second resolution, so a status
+        change within the second of the last poll would still get a 304.
+        """
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            probe = get_object_or_404(
+                Submission.objects.only('id', 'student', 'status', 'submitted_at', 'graded_at'),
+                pk=kwargs[self.lookup_field]
+            )
+            self.check_object_permissions(request, probe)
+            not_modified = get_conditional_response(request, etag=self._etag(probe))
+            if not_modified is not None:
+                return not_modified
+        
+        instance = self.get_object()
+        response = Response(self.get_serializer(instance).data)
+        response['ETag'] = self._etag(instance)
+        return response
+    
+    @staticmethod
+    def _etag(submission):
+        changed = submission.graded_at or submission.submitted_at
+        return quote_etag(f'{submission.pk}-{submission.status}-{changed.timestamp()}')
+
+
+@extend_schema(
+    tags=['Submissions'],
+    summary='Poll submission grading status',
+    description='''
+    Lightweight status check for submissions graded asynchronously
+    (`GRADING_ASYNC`). Returns only the status and score, not the answers.
+    
+    **Performance:**
+    Graded and failed submissions never change again, so their status is
+    served from the cache; pending ones are read with a narrow primary-key
+    lookup on every poll.
+    
+    **Security:**
+    - You can ONLY poll your own submissions (403 otherwise)
+    ''',
+    parameters=[
+        OpenApiParameter(
+            name='pk',
+            type=OpenApiTypes.UUID,
+            location=OpenApiParameter.PATH,
+            description='Submission UUID'
+        )
+    ],
+    responses={
+        200: {
+            'description': 'Current grading status',
+            'content': {
+                'application/json': {
+                    'example': {
+                        'submission_id': '950e8400-e29b-41d4-a716-446655440000',
+                        'status': 'graded',
+                        'score': 85,
+                        'max_possible_score': 100
+                    }
+                }
+            }
+        },
+        403: {
+            'description': 'Not your submission',
+            'content': {
+                'application/json': {
+                    'example': {
+                        'detail': 'You do not have permission to perform this action.'
+                    }
+                }
+            }
+        },
+        404: {
+            'description': 'Submission not found',
+            'content': {
+                'application/json': {
+                    'example': {
+                        'detail': 'Not found.'
+                    }
+                }
+            }
+        }
+    }
+)
+class SubmissionStatusView(APIView):
+    """
+    Poll grading progress without loading answers.
+    """
+    permission_classes = [IsAuthenticated, IsSubmissionOwner]
+    
+    # States grading never leaves; safe to cache without invalidation
+    FINAL_STATUSES = ('graded', 'failed')
+    
+    def get(self, request, pk):
+        key = f'submission-status:{pk}'
+        submission = cache.get(key)
+        
+        if submission is None:
+            submission = get_object_or_404(
+                Submission.objects.only('id', 'student', 'status', 'score', 'max_possible_score'),
+                pk=pk
+            )
+            if submission.status in self.FINAL_STATUSES:
+                cache.set(key, submission, settings.SUBMISSION_STATUS_CACHE_TIMEOUT)
+        
+        self.check_object_permissions(request, submission)
+        return Response({
+            'submission_id': submission.id,
+            'status': submission.status,
+            'score': submission.score,
+            'max_possible_score': submission.max_possible_score
+        })
@@ -0,0 +1,13 @@
+"""
+Celery application for background grading.
+Only needed when GRADING_ASYNC is enabled.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
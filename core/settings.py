@@ -1,7 +1,11 @@
 import sys
+import functools
+import logging
+import queue
 import os
 from pathlib import Path
 from decouple import config, Csv
+from django.utils.functional import lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -38,7 +42,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Compresses GET responses (exam payloads are large, repetitive JSON)
+    'apps.assessments.middleware.SafeMethodGZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    # ETag/304 for GET responses whose view did not set its own
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -73,6 +81,16 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # I've made this flexible - supports MySQL, PostgreSQL and SQLite
 DB_ENGINE = config('DB_ENGINE', default='django.db.backends.sqlite3')
 
+# Keep connections open across requests instead of reconnecting (TCP, TLS,
+# auth) every time; health checks drop ones the server closed meanwhile.
+# For pooling across processes, point DB_HOST at PgBouncer.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+
+# Requires psycopg 3: send parameters separately and prepare queries once a
+# connection has run them DB_PREPARE_THRESHOLD times, so Postgres reuses their
+# plans (not compatible with PgBouncer in transaction mode)
+DB_SERVER_SIDE_BINDING = config('DB_SERVER_SIDE_BINDING', default=False, cast=bool)
+
     # PostgreSQL configuration
 if DB_ENGINE == 'django.db.backends.postgresql':
     DATABASES = {
@@ -83,8 +101,19 @@ if DB_ENGINE == 'django.db.backends.postgresql':
             'PASSWORD': config('DB_PASSWORD', default=''),
             'HOST': config('DB_HOST', default='localhost'),
             'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'server_side_binding': DB_SERVER_SIDE_BINDING,
+            },
         }
     }
+    if DB_SERVER_SIDE_BINDING:
+        # Django turns psycopg's statement preparation off unless OPTIONS
+        # sets a threshold
+        DATABASES['default']['OPTIONS']['prepare_threshold'] = config(
+            'DB_PREPARE_THRESHOLD', default=5, cast=int
+        )
 elif DB_ENGINE == 'django.db.backends.mysql':
     # MySQL configuration (alternative)
     DATABASES = {
@@ -95,6 +124,8 @@ elif DB_ENGINE == 'django.db.backends.mysql':
             'PASSWORD': config('DB_PASSWORD', default=''),
             'HOST': config('DB_HOST', default='localhost'),
             'PORT': config('DB_PORT', default='3306'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 else:
@@ -138,43 +169,45 @@ AUTH_USER_MODEL = 'assessments.User'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication with token lookups served from the cache
+        'apps.assessments.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # JSON through orjson when installed, stock json otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.assessments.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.assessments.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Per-IP cap on login attempts, so brute force can't monopolize
+    # workers with password hashing
+    'DEFAULT_THROTTLE_RATES': {
+        'login': config('LOGIN_THROTTLE_RATE', default='10/min'),
+    },
 }
 
 
 # ==============================================
 # API DOCUMENTATION (Swagger/OpenAPI)
 # ==============================================
+@functools.cache
+def _load_api_description():
+    # Only read when a schema is generated, not on every settings import
+    return (BASE_DIR / 'apps' / 'assessments' / 'schema_description.md').read_text(encoding='utf-8')
+
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Assessment Engine API',
-    'DESCRIPTION': '''
-    RESTful API for secure exam submission and automated grading.
-    
-    **Features:**
-    - Token-based authentication
-    - UUID-based IDs for security
-    - Automated grading with both algorithmic and AI-powered options
-    - Query-optimized endpoints
-    - Comprehensive error handling
-    
-    **Authentication:**
-    1. Register at `/api/auth/register/` or login at `/api/auth/login/`
-    2. Include the token in all requests: `Authorization: Token <your-token>`
-    
-    **Quick Start:**
-    1. Register/Login → Get token
-    2. List exams → Choose one
-    3. Get exam details → See questions
-    4. Submit answers → Get graded
-    5. View results → See detailed feedback
-    ''',
+    'DESCRIPTION': lazy(_load_api_description, str)(),
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
     'COMPONENT_SPLIT_REQUEST': True,
@@ -186,6 +219,58 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
+# Serve /api/schema/ and /api/docs/ (disable to serve a schema prebuilt with
+# `manage.py spectacular --file schema.yml` from static hosting instead)
+API_DOCS_ENABLED = config('API_DOCS_ENABLED', default=True, cast=bool)
+API_SCHEMA_CACHE_TIMEOUT = config('API_SCHEMA_CACHE_TIMEOUT', default=60 * 60, cast=int)
+# Commit being deployed; part of the schema cache key so a deploy never
+# serves the previous release's cached schema
+GIT_SHA = config('GIT_SHA', default='')
+
+
+# ==============================================
+# CACHING
+# ==============================================
+# Redis when REDIS_URL is set (shared across processes, requires `redis`),
+# per-process memory otherwise
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Signal-driven invalidation only reaches every worker through a shared
+# cache; with the per-process fallback, caches that must not go stale are
+# off by default (a timeout of 0 disables them)
+SHARED_CACHE = bool(REDIS_URL)
+
+# Seconds a resolved auth token is reused before hitting the database again
+AUTH_TOKEN_CACHE_TIMEOUT = config(
+    'AUTH_TOKEN_CACHE_TIMEOUT', default=60 * 60 if SHARED_CACHE else 0, cast=int
+)
+# Seconds a final (graded/failed) submission status is served from cache
+SUBMISSION_STATUS_CACHE_TIMEOUT = config('SUBMISSION_STATUS_CACHE_TIMEOUT', default=60 * 60, cast=int)
+# Seconds a rendered exam-list page is served from cache; edits to exams
+# or questions invalidate it immediately, but only in a shared cache
+EXAM_LIST_CACHE_TIMEOUT = config(
+    'EXAM_LIST_CACHE_TIMEOUT', default=60 if SHARED_CACHE else 0, cast=int
+)
+# Seconds a rendered exam (with questions) is served from cache; also
+# invalidated on every exam or question edit. A stale question set makes
+# submissions fail validation, so it needs a shared cache by default.
+EXAM_DETAIL_CACHE_TIMEOUT = config(
+    'EXAM_DETAIL_CACHE_TIMEOUT', default=60 * 60 if SHARED_CACHE else 0, cast=int
+)
+
 
 # ==============================================
 # GRADING SERVICE CONFIGURATION
@@ -193,6 +278,16 @@ SPECTACULAR_SETTINGS = {
 # Switch between 'mock' (algorithmic) and 'gemini' (AI-powered)
 GRADER_TYPE = config('GRADER_TYPE', default='mock')
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
+# Must support system instructions (Gemini 1.5 or later)
+GEMINI_MODEL = config('GEMINI_MODEL', default='gemini-1.5-flash')
+# How long LLM grades are reused for identical answers to the same question
+GRADING_CACHE_TIMEOUT = config('GRADING_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Grade submissions on Celery workers instead of inside the request
+# (requires `celery` and a running broker)
+GRADING_ASYNC = config('GRADING_ASYNC', default=False, cast=bool)
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
+CELERY_TASK_IGNORE_RESULT = True
 
 
 # ==============================================
@@ -200,7 +295,8 @@ GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
 # ==============================================
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
-USE_I18N = True
+# The API ships no translations; skip per-request translation activation
+USE_I18N = False
 USE_TZ = True
 
 
@@ -210,6 +306,24 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Serve collected static files (admin, Swagger UI) from the app with
+# hashed names, far-future caching and gzip/brotli variants built by
+# collectstatic (requires `whitenoise`)
+if config('USE_WHITENOISE', default=False, cast=bool):
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'whitenoise.middleware.WhiteNoiseMiddleware'
+    )
+    STORAGES = {
+        'default': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        },
+        'staticfiles': {
+            'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+        },
+    }
+    WHITENOISE_MAX_AGE = 60 * 60 * 24 * 365
+
 
 # ==============================================
 # DEFAULT PRIMARY KEY FIELD TYPE
@@ -225,22 +339,34 @@ if not DEBUG:
     SECURE_SSL_REDIRECT = config('SECURE_SSL_REDIRECT', default=True, cast=bool)
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
-    SECURE_BROWSER_XSS_FILTER = True
     SECURE_CONTENT_TYPE_NOSNIFF = True
+    # Browsers remember to use HTTPS, skipping the redirect on later visits
+    SECURE_HSTS_SECONDS = config('SECURE_HSTS_SECONDS', default=60 * 60 * 24 * 365, cast=int)
     X_FRAME_OPTIONS = 'DENY'
 
 
 # ==============================================
 # LOGGING CONFIGURATION
 # ==============================================
-# I've set up basic logging for debugging and error tracking
+# I've set up basic logging for debugging and error tracking.
+# Request threads only enqueue records for the file; a QueueListener
+# started in AssessmentsConfig.ready() hands them to 'memory', which
+# buffers up to 512 records (or until an ERROR) before writing the file.
+LOG_QUEUE = queue.Queue(-1)
+
+# Created together with the log file, on the first write
+LOGS_DIR = BASE_DIR / 'logs'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
         'verbose': {
-            'format': '[{levelname}] {asctime} {module} {message}',
-            'style': '{',
+            '()': 'apps.assessments.log_handlers.FastFormatter',
+            'fmt': '[{levelname}] {asctime} {module} {message}',
+        },
+        'json': {
+            '()': 'apps.assessments.log_handlers.JsonFormatter',
         },
     },
     'handlers': {
@@ -248,29 +374,65 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
+        # Not attached to loggers: 'queue' feeds 'memory', which feeds 'file'
         'file': {
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs' / 'django.log',
-            'formatter': 'verbose',
+            'class': 'apps.assessments.log_handlers.LazyRotatingFileHandler',
+            'filename': LOGS_DIR / 'django.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'encoding': 'utf-8',
+            # 'json' writes one object per line for log shippers
+            'formatter': config('LOG_FILE_FORMAT', default='verbose'),
+        },
+        'memory': {
+            'class': 'logging.handlers.MemoryHandler',
+            'capacity': 512,
+            # A level number: Python < 3.12 doesn't convert level names here
+            'flushLevel': logging.ERROR,
+            'target': 'file',
+        },
+        'queue': {
+            '()': 'apps.assessments.log_handlers.queue_handler',
+            'queue': LOG_QUEUE,
+            'handlers': ['memory'],
         },
     },
     'loggers': {
         'django': {
             'handlers': ['console'],
             'level': config('DJANGO_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+        # Per-query records (only emitted in DEBUG) are dropped unless asked for
+        'django.db.backends': {
+            'handlers': ['console'],
+            'level': 'DEBUG' if config('LOG_SQL_QUERIES', default=False, cast=bool) else 'WARNING',
+            'propagate': False,
+        },
+        # Chatty third-party libraries (HTTP clients used by the LLM SDK)
+        'urllib3': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'asyncio': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
         },
         'apps.assessments': {
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG' if DEBUG else 'INFO',
+            'handlers': ['console', 'queue'],
+            'level': config('ASSESSMENTS_LOG_LEVEL', default='INFO'),
             'propagate': False,
         },
+        # Hot path: runs per graded answer, so only problems are logged
+        'apps.assessments.grading_service': {
+            'level': config('GRADING_LOG_LEVEL', default='WARNING'),
+        },
     },
 }
 
-# Create logs directory if it doesn't exist
-LOGS_DIR = BASE_DIR / 'logs'
-LOGS_DIR.mkdir(exist_ok=True)
-
 
 # ==============================================
 # DEVELOPMENT TOOLS
@@ -278,4 +440,14 @@ LOGS_DIR.mkdir(exist_ok=True)
 if DEBUG and config('ENABLE_DEBUG_TOOLBAR', default=False, cast=bool):
     INSTALLED_APPS += ['debug_toolbar']
     MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
-    INTERNAL_IPS = ['127.0.0.1', 'localhost']
\ No newline at end of file
+    INTERNAL_IPS = ['127.0.0.1', 'localhost']
+    DEBUG_TOOLBAR_CONFIG = {
+        # Panels are rendered on demand when opened, not on every response
+        'RENDER_PANELS': False,
+        # The slowest panels stay off unless switched on in the toolbar
+        'DISABLE_PANELS': {
+            'debug_toolbar.panels.profiling.ProfilingPanel',
+            'debug_toolbar.panels.redirects.RedirectsPanel',
+            'debug_toolbar.panels.templates.TemplatesPanel',
+        },
+    }
\ No newline at end of file
@@ -1,11 +1,32 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
+from django.views.decorators.cache import cache_page
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('apps.assessments.urls')),
+]
 
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-]   
\ No newline at end of file
+if settings.API_DOCS_ENABLED:
+    # Generating the schema introspects every view, so the result is cached
+    # (per URL and Accept header) under a key tied to the API version and
+    # deployed commit rather than rebuilt on each request
+    schema_cache_prefix = 'api-schema-{}-{}'.format(
+        settings.SPECTACULAR_SETTINGS['VERSION'], settings.GIT_SHA
+    )
+    urlpatterns += [
+        path(
+            'api/schema/',
+            cache_page(settings.API_SCHEMA_CACHE_TIMEOUT, key_prefix=schema_cache_prefix)(
+                SpectacularAPIView.as_view()
+            ),
+            name='schema'
+        ),
+        path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    ]
+
+if 'debug_toolbar' in settings.INSTALLED_APPS:
+    # Only importable when ENABLE_DEBUG_TOOLBAR added the app in DEBUG
+    urlpatterns += [path('__debug__/', include('debug_toolbar.urls'))]